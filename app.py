@@ -1,10 +1,17 @@
 import os
 from datetime import date
 
+import plotly.io as pio
 import streamlit as st
 
+# orjson serializes the numeric figure payloads ~5-10x faster than stdlib json
+try:
+    pio.json.config.default_engine = "orjson"
+except ValueError:
+    pass  # orjson not installed; plotly falls back to the default encoder
+
 from core.data import get_weekly_prices_21wma, fetch_company_news_finnhub
-from core.sentiment import load_finbert, score_and_aggregate_weekly
+from core.sentiment import load_finbert, score_headlines, aggregate_weekly
 from core.join import join_price_sentiment, compute_trade_events
 from core.backtest import weekly_backtest_buy_only, perf_summary
 from core.viz import (
@@ -64,6 +71,11 @@ def cached_news(_ticker: str, _start: str, _end: str | None, _token: str):
 def cached_finbert():
     return load_finbert(device_preference=None)
 
+@st.cache_data(show_spinner=False)
+def cached_scores(news_df, _clf):
+    # Scores don't depend on thresholds, so slider tweaks reuse this
+    return score_headlines(news_df, clf=_clf)
+
 st.title("Sentiment + 21WMA (Weekly)")
 st.caption(
     "Buy-only: enter when **extension ≤ entry threshold** and **sentiment is negative**; "
@@ -81,12 +93,12 @@ if st.button("Run analysis", type="primary"):
         with st.spinner("Scoring sentiment…"):
             if news_df is not None and not news_df.empty:
                 finbert = cached_finbert()
-                wk = score_and_aggregate_weekly(
-                    news_df,
+                scored = cached_scores(news_df, finbert)
+                wk = aggregate_weekly(
+                    scored,
                     min_headlines=int(min_headlines),
                     neg_threshold=float(neg_thr),
                     pos_threshold=float(pos_thr),
-                    clf=finbert,
                 )
             else:
                 import pandas as pd
@@ -194,6 +206,8 @@ if st.button("Run analysis", type="primary"):
                 end=end_str,
                 start_equity=1.0,
                 cost_bps=float(cost_bps),
+                # Already have SPY if it's the main ticker — skip the refetch
+                bench_df=weekly_df if ticker == "SPY" else None,
             )
 
         col3, col4 = st.columns(2)
@@ -1,8 +1,22 @@
 import numpy as np
 import pandas as pd
+from numba import njit
 
 from .data import get_weekly_prices_21wma
 
+@njit(cache=True)
+def _run_state_machine(entry, exit_, n):
+    """Fill the 0/1 position array in one compiled pass (cache=True avoids recompiling)."""
+    pos = np.zeros(n, dtype=np.int8)
+    for i in range(n - 1):  # last index can't set i+1
+        if pos[i] == 0 and entry[i]:
+            pos[i + 1] = 1
+        elif pos[i] == 1 and exit_[i]:
+            pos[i + 1] = 0
+        else:
+            pos[i + 1] = pos[i]
+    return pos
+
 def weekly_backtest_buy_only(
     joined: pd.DataFrame,
     bench_ticker: str = "SPY",
@@ -10,59 +24,65 @@ def weekly_backtest_buy_only(
     end: str | None = None,
     start_equity: float = 1.0,
     cost_bps: float = 0.0,
+    bench_df: pd.DataFrame | None = None,
 ) -> pd.DataFrame:
     """
     Simple weekly buy-only backtest:
     - Enter when entry_signal=True at week t -> hold from week t+1
     - Exit when exit_signal=True at week t   -> flat from week t+1
     - Strategy return in week t uses position at t-1 times ret_wk[t]
+    Pass bench_df (a get_weekly_prices_21wma frame) to skip the benchmark
+    download, e.g. when the main ticker IS the benchmark.
     """
-    df = joined.copy()
-    df = df[
-        ["close_wk", "extension_pct", "S_wk", "N", "entry_signal", "exit_signal"]
-    ].copy()
-    df["ret_wk"] = df["close_wk"].pct_change()
+    cols = ["close_wk", "extension_pct", "S_wk", "N", "entry_signal", "exit_signal"]
+    df = joined[cols]  # column selection already yields a new frame
+    ret_wk = df["close_wk"].pct_change()
 
-    # Position state machine (0/1)
-    pos = pd.Series(0, index=df.index, dtype=int)
-    for i in range(len(df) - 1):  # last index can't set i+1
-        if pos.iloc[i] == 0 and bool(df["entry_signal"].iloc[i]):
-            pos.iloc[i + 1] = 1
-        elif pos.iloc[i] == 1 and bool(df["exit_signal"].iloc[i]):
-            pos.iloc[i + 1] = 0
-        else:
-            pos.iloc[i + 1] = pos.iloc[i]
-    df["position"] = pos
+    # Position state machine (0/1): reuse compute_trade_events output when present,
+    # otherwise run the compiled pass here
+    if "position" in joined.columns:
+        pos = joined["position"].to_numpy(dtype=np.int8)
+    else:
+        entry = df["entry_signal"].to_numpy(dtype=np.bool_)
+        exit_ = df["exit_signal"].to_numpy(dtype=np.bool_)
+        pos = _run_state_machine(entry, exit_, len(df))
 
-    # Weekly strategy returns
-    gross = df["position"].shift(1).fillna(0) * df["ret_wk"].fillna(0)
+    # Weekly strategy returns: position at t-1 times ret_wk[t]
+    ret = np.nan_to_num(ret_wk.to_numpy())
+    gross = np.roll(pos, 1).astype(float)
+    if len(df):  # frame can be empty when the start filter drops every week
+        gross[0] = 0.0
+    gross *= ret
 
     # Transaction costs on flips (entry/exit) charged at start of week t
-    turnover = df["position"].fillna(0).diff().abs().fillna(0)
+    turnover = np.abs(np.diff(pos, prepend=np.int8(0)))
     costs = (cost_bps / 1e4) * turnover
     net = gross - costs
 
-    df["strat_ret"] = net
-    df["strat_eq"] = start_equity * (1 + df["strat_ret"]).cumprod()
-
     # Benchmark on same grid
-    bench = get_weekly_prices_21wma(bench_ticker, start, end)
+    bench = bench_df if bench_df is not None else get_weekly_prices_21wma(bench_ticker, start, end)
     bench_ret = bench["close_wk"].pct_change()
     bench_ret = bench_ret.reindex(df.index).fillna(0.0)
-    bench_eq = start_equity * (1 + bench_ret).cumprod()
 
-    df["bench_ret"] = bench_ret
-    df["bench_eq"] = bench_eq
-    return df
+    # Single assign attaches all derived columns without touching the caller's frame
+    return df.assign(
+        ret_wk=ret_wk,
+        position=pos,
+        strat_ret=net,
+        strat_eq=start_equity * np.cumprod(1 + net),
+        bench_ret=bench_ret,
+        bench_eq=start_equity * (1 + bench_ret).cumprod(),
+    )
 
 def perf_summary(eq: pd.Series) -> dict:
-    eq = eq.dropna()
-    r_total = eq.iloc[-1] / eq.iloc[0] - 1
-    weeks = max(len(eq) - 1, 1)
-    years = weeks / 52.0
-    cagr = (1 + r_total) ** (1 / years) - 1 if years > 0 else float("nan")
-    rets = eq.pct_change().dropna()
-    vol_w = rets.std()
-    sharpe = (rets.mean() / vol_w) * np.sqrt(52) if vol_w and vol_w > 0 else float("nan")
-    mdd = ((eq / eq.cummax()) - 1).min()
+    a = eq.dropna().to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r_total = a[-1] / a[0] - 1
+        weeks = max(a.size - 1, 1)
+        years = weeks / 52.0
+        cagr = (1 + r_total) ** (1 / years) - 1 if years > 0 else float("nan")
+        r = np.diff(a) / a[:-1]
+        vol_w = r.std(ddof=1) if r.size > 1 else float("nan")
+        sharpe = (r.mean() / vol_w) * np.sqrt(52) if vol_w and vol_w > 0 else float("nan")
+        mdd = (a / np.maximum.accumulate(a) - 1).min()
     return dict(total_return=r_total, cagr=cagr, sharpe=sharpe, max_dd=mdd)
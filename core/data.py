@@ -1,7 +1,11 @@
+import calendar
+import json
 import os
-import re
+import threading
 import time
-from datetime import date, datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from pathlib import Path
 from typing import Iterable, Tuple
 
 import pandas as pd
@@ -11,6 +15,16 @@ import yfinance as yf
 
 ET = pytz.timezone("America/New_York")
 
+# -------- On-disk cache (survives Streamlit restarts, unlike st.cache_data) --------
+
+_CACHE_ROOT = Path(".cache")
+
+def _cache_fresh(path: Path, ttl_hours: float) -> bool:
+    try:
+        return (time.time() - path.stat().st_mtime) < ttl_hours * 3600
+    except OSError:
+        return False
+
 # -------- Prices (weekly, 21WMA, extension) --------
 
 def get_weekly_prices_21wma(ticker: str, start: str, end: str | None = None, buffer_weeks: int = 30) -> pd.DataFrame:
@@ -22,23 +36,33 @@ def get_weekly_prices_21wma(ticker: str, start: str, end: str | None = None, buf
     start_ts = pd.Timestamp(start).tz_localize(ET)
     buffered_start = (start_ts - pd.Timedelta(weeks=buffer_weeks)).date().isoformat()
 
-    df = yf.download(ticker, start=buffered_start, end=end, auto_adjust=True, progress=False)
-    if df.empty:
-        raise ValueError(f"No price data for {ticker} between {buffered_start} and {end}")
-
-    # 1-D adjusted close series (robust to MultiIndex)
-    if isinstance(df.columns, pd.MultiIndex):
-        close = df['Close'][ticker]
+    cache_path = _CACHE_ROOT / "prices" / f"{ticker}_{buffered_start}_{end}.parquet"
+    # Ranges ending today may still gain bars intraday; closed ranges are stabler
+    ttl_hours = 6 if end >= datetime.now(ET).date().isoformat() else 24
+    if _cache_fresh(cache_path, ttl_hours):
+        close = pd.read_parquet(cache_path)['close']
     else:
-        close = df['Close']
-    close.name = 'close'
-    close.index = pd.to_datetime(close.index).tz_localize('UTC').tz_convert(ET).normalize()
+        df = yf.download(ticker, start=buffered_start, end=end, auto_adjust=True, progress=False)
+        if df.empty:
+            raise ValueError(f"No price data for {ticker} between {buffered_start} and {end}")
+
+        # 1-D adjusted close series (robust to MultiIndex)
+        if isinstance(df.columns, pd.MultiIndex):
+            close = df['Close'][ticker]
+        else:
+            close = df['Close']
+        close.name = 'close'
+        close.index = pd.to_datetime(close.index).tz_localize('UTC').tz_convert(ET).normalize()
+
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        close.to_frame().to_parquet(cache_path, compression='zstd')
 
     close_wk = close.resample('W-FRI').last()
     wma21 = close_wk.rolling(21, min_periods=1).mean()
     extension_pct = close_wk / wma21 - 1.0
 
-    weekly = pd.DataFrame({'close_wk': close_wk.astype(float), 'wma21': wma21.astype(float), 'extension_pct': extension_pct.astype(float)})
+    # float32 is plenty for weekly closes/extensions and halves memory traffic downstream
+    weekly = pd.DataFrame({'close_wk': close_wk.astype('float32'), 'wma21': wma21.astype('float32'), 'extension_pct': extension_pct.astype('float32')})
     weekly = weekly[weekly.index >= pd.Timestamp(start, tz=ET)]
     return weekly
 
@@ -49,25 +73,28 @@ def _month_chunks(start_date: str, end_date: str) -> Iterable[Tuple[str, str]]:
     e = pd.to_datetime(end_date or date.today()).date()
     cur = date(s.year, s.month, 1)
     while cur <= e:
-        nxt = (pd.Timestamp(cur) + pd.offsets.MonthEnd(0)).date()
+        # Plain int arithmetic; no pandas offset objects in the generator
+        last_day = calendar.monthrange(cur.year, cur.month)[1]
+        nxt = date(cur.year, cur.month, last_day)
         win_start = max(s, cur)
         win_end = min(e, nxt)
         yield win_start.isoformat(), win_end.isoformat()
-        cur = (nxt + timedelta(days=1))
-
-def _norm(s: str) -> str:
-    s = (s or '').strip().lower()
-    return re.sub(r'\s+', ' ', s)
-
-def _dedupe_rows(rows: list[dict]) -> list[dict]:
-    seen, out = set(), []
-    for r in rows:
-        key = (_norm(r.get('headline','')), _norm(r.get('url','')))
-        if key in seen:
-            continue
-        seen.add(key)
-        out.append(r)
-    return out
+        cur = date(cur.year + cur.month // 12, cur.month % 12 + 1, 1)
+
+_FINNHUB_URL = "https://finnhub.io/api/v1/company-news"
+_FINNHUB_RPM = 60  # Finnhub free-tier budget: 60 calls/minute
+_rate_lock = threading.Lock()
+_next_call_at = 0.0
+
+def _rate_wait():
+    """Space request starts at least 60/RPM seconds apart across all threads."""
+    global _next_call_at
+    with _rate_lock:
+        now = time.monotonic()
+        wait = _next_call_at - now
+        _next_call_at = max(now, _next_call_at) + 60.0 / _FINNHUB_RPM
+    if wait > 0:
+        time.sleep(wait)
 
 def fetch_company_news_finnhub(symbol: str, start: str, end: str | None, token: str) -> pd.DataFrame:
     token = token or os.getenv('FINNHUB_API_KEY')
@@ -75,17 +102,44 @@ def fetch_company_news_finnhub(symbol: str, start: str, end: str | None, token:
         raise RuntimeError("Missing FINNHUB_API_KEY (env or Streamlit secrets)")
 
     end = end or date.today().isoformat()
+    today = date.today().isoformat()
     all_rows: list[dict] = []
+    to_fetch: list[tuple[str, str, Path]] = []
     for s, e in _month_chunks(start, end):
-        resp = requests.get("https://finnhub.io/api/v1/company-news", params={"symbol": symbol, "from": s, "to": e, "token": token}, timeout=30)
-        if resp.status_code != 200:
-            print("Finnhub error", resp.status_code, resp.text[:200])
-            continue
-        rows = resp.json() or []
-        all_rows.extend(rows)
-        time.sleep(0.2)
-
-    all_rows = _dedupe_rows(all_rows)
+        chunk_path = _CACHE_ROOT / "news" / f"{symbol}_{s}_{e}.json"
+        # Finished months rarely change; the in-progress month keeps growing
+        ttl_hours = 6 if e >= today else 24 * 7
+        if _cache_fresh(chunk_path, ttl_hours):
+            all_rows.extend(json.loads(chunk_path.read_text()))
+        else:
+            to_fetch.append((s, e, chunk_path))
+
+    if to_fetch:
+        session = requests.Session()  # connection reuse across chunks
+
+        def _fetch(args: tuple[str, str, Path]):
+            s, e, _ = args
+            params = {"symbol": symbol, "from": s, "to": e, "token": token}
+            _rate_wait()
+            resp = session.get(_FINNHUB_URL, params=params, timeout=30)
+            if resp.status_code == 429:
+                # Shouldn't happen at 60/min; back off once instead of dropping the month
+                time.sleep(2.0)
+                _rate_wait()
+                resp = session.get(_FINNHUB_URL, params=params, timeout=30)
+            if resp.status_code != 200:
+                print("Finnhub error", resp.status_code, resp.text[:200])
+                return None
+            return resp.json() or []
+
+        with ThreadPoolExecutor(max_workers=min(6, len(to_fetch))) as ex:
+            for (s, e, chunk_path), rows in zip(to_fetch, ex.map(_fetch, to_fetch)):
+                if rows is None:
+                    continue
+                chunk_path.parent.mkdir(parents=True, exist_ok=True)
+                chunk_path.write_text(json.dumps(rows))
+                all_rows.extend(rows)
+
     if not all_rows:
         return pd.DataFrame(columns=["dt_et","headline","summary","text","url","source"])  # empty
 
@@ -96,7 +150,13 @@ def fetch_company_news_finnhub(symbol: str, start: str, end: str | None, token:
     df['summary'] = df.get('summary','')
     df['url']     = df.get('url','')
     df['source']  = df.get('source','')
-    df['text']    = (df['headline'].fillna('') + '. ' + df['summary'].fillna('')).str.strip()
+
+    # Dedupe on normalized (headline, url) with vectorized str ops; keeps first
+    # occurrence, same as the old per-row set-based pass
+    df['headline_norm'] = df['headline'].fillna('').str.lower().str.replace(r'\s+', ' ', regex=True).str.strip()
+    df['url_norm']      = df['url'].fillna('').str.lower().str.replace(r'\s+', ' ', regex=True).str.strip()
+    df = df.drop_duplicates(subset=['headline_norm', 'url_norm']).drop(columns=['headline_norm', 'url_norm'])
+    df['text']    = df['headline'].str.cat(df['summary'], sep='. ', na_rep='').str.strip()
     df = df[df['text'].str.len() > 0].copy()
     df.sort_values('dt_et', inplace=True)
     df.reset_index(drop=True, inplace=True)
@@ -1,8 +1,38 @@
+import numpy as np
 import pandas as pd
 import pytz
+from numba import njit
+
+try:
+    import numexpr  # noqa: F401  (used via DataFrame.eval engine="numexpr")
+    _HAS_NUMEXPR = True
+except ImportError:
+    _HAS_NUMEXPR = False
 
 ET = pytz.timezone("America/New_York")
 
+@njit(cache=True)
+def _events_and_position(entry_sig, exit_sig):
+    """Single compiled pass deriving position + event/exec flags from raw signals."""
+    n = entry_sig.shape[0]
+    pos = np.zeros(n, dtype=np.int8)
+    entry_event = np.zeros(n, dtype=np.bool_)
+    exit_event = np.zeros(n, dtype=np.bool_)
+    entry_exec = np.zeros(n, dtype=np.bool_)  # execution week t+1
+    exit_exec = np.zeros(n, dtype=np.bool_)
+    for i in range(n - 1):  # last row can't set t+1
+        if pos[i] == 0 and entry_sig[i]:
+            entry_event[i] = True
+            entry_exec[i + 1] = True
+            pos[i + 1] = 1
+        elif pos[i] == 1 and exit_sig[i]:
+            exit_event[i] = True
+            exit_exec[i + 1] = True
+            pos[i + 1] = 0
+        else:
+            pos[i + 1] = pos[i]
+    return pos, entry_event, exit_event, entry_exec, exit_exec
+
 def join_price_sentiment(
     weekly_df: pd.DataFrame,
     wk: pd.DataFrame,
@@ -13,59 +43,63 @@ def join_price_sentiment(
     min_headlines: int = 3,
 ) -> pd.DataFrame:
     """Join weekly prices with weekly sentiment + build raw entry/exit conditions."""
-    out = weekly_df.copy()
-
-    if len(wk.index) and (wk.index.tz is None):
-        wk = wk.copy()
-        wk.index = wk.index.tz_localize(ET)
-
     wk_small = (
         wk.reindex(columns=["S_wk", "N", "is_negative", "is_positive"])
         if not wk.empty
-        else pd.DataFrame(columns=["S_wk", "N", "is_negative", "is_positive"])
+        else pd.DataFrame(columns=["S_wk", "N", "is_negative", "is_positive"], dtype="float32")
     )
-    out = out.join(wk_small, how="left")
+    if len(wk_small.index) and (wk_small.index.tz is None):
+        wk_small.index = wk_small.index.tz_localize(ET)
 
-    out["is_negative"] = (
-        (out["S_wk"] <= neg_threshold) & (out["N"] >= min_headlines)
-    ).fillna(False)
-    out["is_positive"] = (
-        (out["S_wk"] >= pos_threshold) & (out["N"] >= min_headlines)
-    ).fillna(False)
+    # join already materializes a new frame; no upfront copy of weekly_df needed
+    out = weekly_df.join(wk_small, how="left")
 
-    out["is_undervalued"] = (out["extension_pct"] <= entry_ext_thr).fillna(False)
-    out["is_stretched"]   = (out["extension_pct"] >= exit_ext_thr).fillna(False)
+    # NaN comparisons are False by construction on both paths, so no fillna
+    # round-trips or bool Series temporaries
+    if _HAS_NUMEXPR:
+        # numexpr fuses each compound comparison into one multithreaded pass
+        local = {"neg": neg_threshold, "pos": pos_threshold, "min_h": min_headlines,
+                 "ent": entry_ext_thr, "exi": exit_ext_thr}
+        is_negative = out.eval("S_wk <= @neg & N >= @min_h", local_dict=local, engine="numexpr").to_numpy()
+        is_positive = out.eval("S_wk >= @pos & N >= @min_h", local_dict=local, engine="numexpr").to_numpy()
+        is_undervalued = out.eval("extension_pct <= @ent", local_dict=local, engine="numexpr").to_numpy()
+        is_stretched = out.eval("extension_pct >= @exi", local_dict=local, engine="numexpr").to_numpy()
+    else:
+        s = out["S_wk"].to_numpy(dtype=np.float32)
+        n = out["N"].to_numpy(dtype=np.float32)
+        ext = out["extension_pct"].to_numpy(dtype=np.float32)
 
-    # Raw conditions (not yet stateful)
-    out["entry_signal"] = out["is_undervalued"] & out["is_negative"]
-    out["exit_signal"]  = out["is_stretched"]   & out["is_positive"]
+        # float32 thresholds so the comparisons never upcast the arrays
+        enough_news = n >= np.float32(min_headlines)
+        is_negative = (s <= np.float32(neg_threshold)) & enough_news
+        is_positive = (s >= np.float32(pos_threshold)) & enough_news
+        is_undervalued = ext <= np.float32(entry_ext_thr)
+        is_stretched = ext >= np.float32(exit_ext_thr)
+
+    # Single assign keeps the new bool columns in one block
+    out = out.assign(
+        is_negative=is_negative,
+        is_positive=is_positive,
+        is_undervalued=is_undervalued,
+        is_stretched=is_stretched,
+        # Raw conditions (not yet stateful)
+        entry_signal=is_undervalued & is_negative,
+        exit_signal=is_stretched & is_positive,
+    )
     return out
 
 def compute_trade_events(joined: pd.DataFrame) -> pd.DataFrame:
     """Derive stateful entry/exit events and execution (t+1) flags from raw signals."""
-    df = joined.copy()
-    n = len(df)
-    pos = pd.Series(0, index=df.index, dtype=int)
-    entry_event = pd.Series(False, index=df.index)
-    exit_event  = pd.Series(False, index=df.index)
-    entry_exec  = pd.Series(False, index=df.index)  # execution week t+1
-    exit_exec   = pd.Series(False, index=df.index)
-
-    for i in range(n - 1):  # last row can't set t+1
-        if pos.iloc[i] == 0 and bool(df["entry_signal"].iloc[i]):
-            entry_event.iloc[i] = True
-            entry_exec.iloc[i + 1] = True
-            pos.iloc[i + 1] = 1
-        elif pos.iloc[i] == 1 and bool(df["exit_signal"].iloc[i]):
-            exit_event.iloc[i] = True
-            exit_exec.iloc[i + 1] = True
-            pos.iloc[i + 1] = 0
-        else:
-            pos.iloc[i + 1] = pos.iloc[i]
+    sig = joined[["entry_signal", "exit_signal"]].to_numpy(dtype=np.bool_)
+    pos, entry_event, exit_event, entry_exec, exit_exec = _events_and_position(
+        np.ascontiguousarray(sig[:, 0]), np.ascontiguousarray(sig[:, 1])
+    )
 
-    df["position"]    = pos
-    df["entry_event"] = entry_event   # decision week (t)
-    df["exit_event"]  = exit_event    # decision week (t)
-    df["entry_exec"]  = entry_exec    # execution week (t+1)
-    df["exit_exec"]   = exit_exec     # execution week (t+1)
-    return df
\ No newline at end of file
+    # assign: new frame over the existing column blocks + the jitted arrays
+    return joined.assign(
+        position=pos,
+        entry_event=entry_event,  # decision week (t)
+        exit_event=exit_event,    # decision week (t)
+        entry_exec=entry_exec,    # execution week (t+1)
+        exit_exec=exit_exec,      # execution week (t+1)
+    )
\ No newline at end of file
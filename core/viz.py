@@ -11,40 +11,48 @@ def _tz_index(idx):
     except Exception:
         return pd.DatetimeIndex(idx).tz_localize(ET)
 
-def _sentiment_color(s, n, neg_thr=-0.05, min_n=3):
-    # Always draw a band; lighter for low-headline weeks
-    if pd.isna(s):
-        return "rgba(160,160,160,0.06)"
-    if s <= neg_thr:
-        alpha = min(abs(float(s)) / 0.25, 1.0)
-        a = 0.06 + 0.14 * alpha
-        if (pd.notna(n)) and (n < min_n): a *= 0.6
-        return f"rgba(220, 20, 60, {a:.2f})"
-    if s >= 0.05:
-        alpha = min(float(s) / 0.25, 1.0)
-        a = 0.06 + 0.14 * alpha
-        if (pd.notna(n)) and (n < min_n): a *= 0.6
-        return f"rgba(34, 139, 34, {a:.2f})"
-    a = 0.06 if (pd.isna(n) or n >= min_n) else 0.04
-    return f"rgba(120,120,120,{a:.2f})"
+def _sentiment_colors(s_arr, n_arr, neg_thr=-0.05, min_n=3):
+    # Always draw a band; lighter for low-headline weeks. Whole-array version:
+    # one NumPy pass for channels/alphas, one comprehension for the strings.
+    s = np.asarray(s_arr, dtype=float)
+    n = np.asarray(n_arr, dtype=float)
+    nan_s = np.isnan(s)
+    low_n = ~np.isnan(n) & (n < min_n)
+
+    alpha = np.clip(np.abs(s) / 0.25, 0.0, 1.0)
+    a = 0.06 + 0.14 * alpha
+    a = np.where(low_n, a * 0.6, a)
+    neutral_a = np.where(np.isnan(n) | (n >= min_n), 0.06, 0.04)
+
+    with np.errstate(invalid="ignore"):
+        neg = s <= neg_thr
+        pos = s >= 0.05
+    rgb = np.select([nan_s, neg, pos],
+                    ["160,160,160", "220,20,60", "34,139,34"],
+                    default="120,120,120")
+    a_final = np.select([nan_s, neg | pos], [0.06, a], default=neutral_a)
+    return [f"rgba({c},{av:.2f})" for c, av in zip(rgb, a_final)]
 
 def price_sentiment_fig(joined_df: pd.DataFrame, ticker: str,
                         neg_threshold: float = -0.05, min_headlines: int = 3) -> go.Figure:
     """Price + 21WMA with sentiment bands, concise hover, and simplified trade markers."""
-    df = joined_df.copy()
-    df.index = _tz_index(df.index)
-
-    # Hover fields for ALL weeks
-    s_disp = df["S_wk"].apply(lambda x: f"{x:.3f}" if pd.notnull(x) else "—")
-    n_disp = df["N"].fillna(0).astype(int).astype(str)
-    ext_pct = 100 * df["extension_pct"]
-    custom = np.c_[df["wma21"].values, ext_pct.values, s_disp.values, n_disp.values]
+    df = joined_df  # read-only below; tz-converted index kept separately
+    idx = _tz_index(df.index)
+
+    # Hover fields for ALL weeks — numeric-only float32 so the customdata
+    # payload stays compact and hovertemplate does the formatting client-side
+    custom = np.column_stack([
+        df["wma21"].to_numpy(dtype=np.float32),
+        (100 * df["extension_pct"]).to_numpy(dtype=np.float32),
+        df["S_wk"].to_numpy(dtype=np.float32),
+        df["N"].fillna(0).to_numpy(dtype=np.float32),
+    ])
 
     fig = go.Figure()
 
     # Main price trace (single rich hover)
     fig.add_trace(go.Scatter(
-        x=df.index, y=df["close_wk"], name="Weekly Close",
+        x=idx, y=df["close_wk"], name="Weekly Close",
         mode="lines", line=dict(width=2),
         customdata=custom,
         hovertemplate=(
@@ -52,27 +60,35 @@ def price_sentiment_fig(joined_df: pd.DataFrame, ticker: str,
             "Close: %{y:.2f}<br>"
             "21WMA: %{customdata[0]:.2f}<br>"
             "Ext: %{customdata[1]:.1f}%<br>"
-            "S_wk: %{customdata[2]} (N=%{customdata[3]})<extra></extra>"
+            "S_wk: %{customdata[2]:.3f} (N=%{customdata[3]:.0f})<extra></extra>"
         ),
     ))
 
     # 21WMA (no own hover to avoid duplicates)
     fig.add_trace(go.Scatter(
-        x=df.index, y=df["wma21"], name="21-Week MA",
+        x=idx, y=df["wma21"], name="21-Week MA",
         mode="lines", line=dict(width=2, dash="dash"),
         hoverinfo="skip"
     ))
 
-    # Sentiment bands for EVERY week
+    # Sentiment bands for EVERY week — hoist columns to arrays once, index by position
+    n_rows = len(idx)
+    s_arr = df["S_wk"].to_numpy() if "S_wk" in df.columns else np.full(n_rows, np.nan)
+    n_arr = df["N"].to_numpy(dtype=float) if "N" in df.columns else np.full(n_rows, np.nan)
+    t_arr = idx.to_numpy()
+    t1_arr = np.concatenate([t_arr[1:], [t_arr[-1] + pd.Timedelta(days=7)]]) if n_rows else t_arr
+
+    colors = _sentiment_colors(s_arr, n_arr, neg_thr=neg_threshold, min_n=min_headlines)
+    # Run-length merge: consecutive weeks with the same color collapse into one
+    # spanning rect, so the browser gets far fewer shapes to paint on hover
     shapes = []
-    for i, t0 in enumerate(df.index):
-        t1 = df.index[i+1] if i+1 < len(df.index) else (t0 + pd.Timedelta(days=7))
-        s = df.get("S_wk", pd.Series(index=df.index)).iloc[i]
-        n = df.get("N", pd.Series(index=df.index)).iloc[i]
-        color = _sentiment_color(s, n, neg_thr=neg_threshold, min_n=min_headlines)
-        shapes.append(dict(type="rect", xref="x", yref="paper",
-                           x0=t0, x1=t1, y0=0, y1=1,
-                           fillcolor=color, line=dict(width=0), layer="below"))
+    run_start = 0
+    for i in range(1, n_rows + 1):
+        if i == n_rows or colors[i] != colors[run_start]:
+            shapes.append(dict(type="rect", xref="x", yref="paper",
+                               x0=t_arr[run_start], x1=t1_arr[i - 1], y0=0, y1=1,
+                               fillcolor=colors[run_start], line=dict(width=0), layer="below"))
+            run_start = i
     fig.update_layout(shapes=shapes)
 
     # ---- Decision markers (week t): open red circle = Entry, open green diamond = Exit ----
@@ -81,26 +97,26 @@ def price_sentiment_fig(joined_df: pd.DataFrame, ticker: str,
 
     if entry_sig.any():
         fig.add_trace(go.Scatter(
-            x=df.index[entry_sig], y=df.loc[entry_sig, "close_wk"],
+            x=idx[entry_sig.to_numpy()], y=df.loc[entry_sig, "close_wk"],
             name="Entry (decision)", mode="markers",
             marker=dict(symbol="circle-open", size=10,
                         line=dict(width=2, color="crimson")),
             customdata=custom[entry_sig.values],
             hovertemplate=("Decision (t): Entry<br>"
                            "Ext: %{customdata[1]:.1f}% | "
-                           "S_wk: %{customdata[2]} (N=%{customdata[3]})<extra></extra>")
+                           "S_wk: %{customdata[2]:.3f} (N=%{customdata[3]:.0f})<extra></extra>")
         ))
 
     if exit_sig.any():
         fig.add_trace(go.Scatter(
-            x=df.index[exit_sig], y=df.loc[exit_sig, "close_wk"],
+            x=idx[exit_sig.to_numpy()], y=df.loc[exit_sig, "close_wk"],
             name="Exit (decision)", mode="markers",
             marker=dict(symbol="diamond-open", size=11,
                         line=dict(width=2, color="green")),
             customdata=custom[exit_sig.values],
             hovertemplate=("Decision (t): Exit<br>"
                            "Ext: %{customdata[1]:.1f}% | "
-                           "S_wk: %{customdata[2]} (N=%{customdata[3]})<extra></extra>")
+                           "S_wk: %{customdata[2]:.3f} (N=%{customdata[3]:.0f})<extra></extra>")
         ))
 
     # ---- Execution arrows (week t+1): GREEN ▲ open, RED ▼ close ----
@@ -109,14 +125,14 @@ def price_sentiment_fig(joined_df: pd.DataFrame, ticker: str,
 
     if entry_exec.any():
         fig.add_trace(go.Scatter(
-            x=df.index[entry_exec], y=df.loc[entry_exec, "close_wk"],
+            x=idx[entry_exec.to_numpy()], y=df.loc[entry_exec, "close_wk"],
             name="Open position (t+1)", mode="markers",
             marker=dict(size=14, symbol="triangle-up", color="green"),
             hovertemplate=("EXECUTE: Open<br>Week: %{x|%Y-%m-%d}<br>Price: %{y:.2f}<extra></extra>")
         ))
     if exit_exec.any():
         fig.add_trace(go.Scatter(
-            x=df.index[exit_exec], y=df.loc[exit_exec, "close_wk"],
+            x=idx[exit_exec.to_numpy()], y=df.loc[exit_exec, "close_wk"],
             name="Close position (t+1)", mode="markers",
             marker=dict(size=14, symbol="triangle-down", color="crimson"),
             hovertemplate=("EXECUTE: Close<br>Week: %{x|%Y-%m-%d}<br>Price: %{y:.2f}<extra></extra>")
@@ -135,12 +151,11 @@ def extension_fig(joined_df: pd.DataFrame, ticker: str,
                   entry_ext_thr: float = -0.07,
                   exit_ext_thr: float = 0.12) -> go.Figure:
     """Extension panel with dynamic dotted guides from current thresholds."""
-    df = joined_df.copy()
-    df.index = _tz_index(df.index)
+    idx = _tz_index(joined_df.index)
 
     fig = go.Figure()
     fig.add_trace(go.Scatter(
-        x=df.index, y=100 * df["extension_pct"],
+        x=idx, y=100 * joined_df["extension_pct"],
         name="Extension vs 21WMA", mode="lines", line=dict(width=2)
     ))
 